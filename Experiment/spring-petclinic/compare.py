@@ -1,8 +1,10 @@
 from itertools import combinations
 from pathlib import Path
 from datetime import datetime
+import atexit
 import csv
 import random
+import sys
 
 # --- Show description ---
 desc_path = Path("description.txt")
@@ -22,15 +24,19 @@ if len(svg_files) < 2:
     print("❌ Need at least 2 SVG files in 'svgs/' folder.")
     exit(1)
 
-# Generate all unique unordered pairs
-pairs = list(combinations(svg_files, 2))
+# Generate all unique unordered pairs (as indices into svg_files)
+pairs = list(combinations(range(len(svg_files)), 2))
 random.seed(45)
 random.shuffle(pairs)
 
+# Keep votes.csv open for the whole session; every write is flushed right away
+votes_file = open("votes.csv", "a", newline="")
+atexit.register(votes_file.close)
+writer = csv.writer(votes_file)
+
 # Start session log
-with open("votes.csv", "a", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow([f"\n--- Session started ---", datetime.now().isoformat()])
+writer.writerow([f"\n--- Session started ---", datetime.now().isoformat()])
+votes_file.flush()
 
 # --- Rank architectural criteria ---
 criteria = ["Performance", "Reliability", "Maintainability", "Flexibility"]
@@ -50,41 +56,40 @@ for crit in criteria:
             print("❌ Please enter a valid integer.")
 
 # Save criteria rankings to session
-with open("votes.csv", "a", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["\n--- Criteria ranking ---"])
-    for crit, rank in sorted(rankings.items(), key=lambda x: x[1]):
-        writer.writerow([crit, rank])
+writer.writerow(["\n--- Criteria ranking ---"])
+for crit, rank in sorted(rankings.items(), key=lambda x: x[1]):
+    writer.writerow([crit, rank])
+votes_file.flush()
 
 # Match loop
-with open("votes.csv", "a", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["\n--- Matches ---"])
-    writer.writerow(["\nCandidate 1, Candidate 2, Winner"])
+writer.writerow(["\n--- Matches ---"])
+writer.writerow(["\nCandidate 1, Candidate 2, Winner"])
+votes_file.flush()
 
-for i, (svg1, svg2) in enumerate(pairs, 1):
-    id1 = svg_files.index(svg1) + 1
-    id2 = svg_files.index(svg2) + 1
+for i, (a, b) in enumerate(pairs, 1):
+    svg1, svg2 = svg_files[a], svg_files[b]
+    id1, id2 = a + 1, b + 1  # 1-based id shown to the participant
 
-    print("\n" + "="*50)
-    print(f"Match {i} of {len(pairs)}: {id1} vs {id2}")
-    print(f"Vote by entering: {id1} or {id2}")
-    print("="*50)
+    sys.stdout.write(
+        "\n" + "="*50 + "\n"
+        f"Match {i} of {len(pairs)}: {id1} vs {id2}\n"
+        f"Vote by entering: {id1} or {id2}\n"
+        + "="*50 + "\n"
+    )
+    sys.stdout.flush()
 
     while True:
         vote = input("Your vote: ").strip()
         if vote in {str(id1), str(id2)}:
-            with open("votes.csv", "a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([svg1.name, svg2.name, vote])
+            writer.writerow([svg1.name, svg2.name, vote])
+            votes_file.flush()
             print(f"✔️ Saved vote for {vote}")
             break
         else:
             print("❌ Invalid input. Please enter one of the two numbers.")
 
 # End session log
-with open("votes.csv", "a", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow([f"--- Session ended ---", datetime.now().isoformat()])
+writer.writerow([f"--- Session ended ---", datetime.now().isoformat()])
+votes_file.flush()
 
 print("\n✅ All matches completed.")
@@ -13,14 +13,26 @@ Assumptions:
 
 All metric values are rounded/formatted to **2 decimals** in the output.
 
+With --folder the per-metric CSVs are skipped: every *.json decomposition in
+that folder is parsed ONCE and all five metrics are computed from it directly
+(same values as running the five metric scripts and merging their CSVs).
+
 Usage:
   python aggregate_metrics.py --out metrics_agg.csv
+  python aggregate_metrics.py --folder /path/to/jsons --out metrics_agg.csv
 """
 
-import csv, re, sys, argparse
+import csv, io, json, os, re, sys, argparse
+from multiprocessing import Pool
 from pathlib import Path
 from collections import defaultdict
 
+from code_modularity import cmod_for_data, load_json
+from cyclic_independence import cid_for_data
+from service_coupling_factor import scf_for_data
+from smad import analyze_data
+from dccmd import depths_for_data, dccmd_stats
+
 METRIC_HEADERS = {
     "CiD":   ["CiD"],
     "CMod":  ["CMod", "overall_modularity", "overall_mod"],
@@ -29,9 +41,18 @@ METRIC_HEADERS = {
     "DCCMD": ["DCCMD"],        
 }
 
+# wide SMAD/DCCMD variants, e.g. SMAD_c7 / DCCMD_c2.0
+SMAD_WIDE_RE  = re.compile(r"SMAD_c[\d.]+")
+DCCMD_WIDE_RE = re.compile(r"DCCMD_c[\d.]+")
+
 def cli():
     p = argparse.ArgumentParser(description="Aggregate metric CSVs into one table (current folder).")
     p.add_argument("--out", default="metrics_agg.csv", help="Output CSV path")
+    p.add_argument("--folder", default=None,
+                   help="Compute metrics straight from the *.json files in this folder "
+                        "instead of merging CSVs")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="Worker processes for --folder (default: all CPU cores)")
     return p.parse_args()
 
 def pick_metric(headers):
@@ -41,10 +62,10 @@ def pick_metric(headers):
             if c in headers:
                 return metric, c
     for h in headers:
-        if re.fullmatch(r"SMAD_c[\d.]+", h):
+        if SMAD_WIDE_RE.fullmatch(h):
             return "SMAD", ("SMAD_c7" if "SMAD_c7" in headers else h)
     for h in headers:
-        if re.fullmatch(r"DCCMD_c[\d.]+", h):
+        if DCCMD_WIDE_RE.fullmatch(h):
             return "DCCMD", ("DCCMD_c2.0" if "DCCMD_c2.0" in headers else h)
     return None, None
 
@@ -69,6 +90,48 @@ def fmt2(val: str) -> str:
     except ValueError:
         return s  # if it isn't numeric, leave it untouched
 
+def compute_all(jpath: Path):
+    """
+    Parse ONE decomposition JSON and return all five metrics, formatted
+    exactly as the per-metric scripts write them to their CSVs.
+    """
+    try:
+        data = load_json(jpath)
+    except json.JSONDecodeError:
+        return dict.fromkeys(METRIC_HEADERS, "NA")
+
+    cid    = cid_for_data(data, jpath.name)
+    cmod   = cmod_for_data(data)
+    scf    = scf_for_data(data, jpath.name)
+    smad   = analyze_data(data, jpath.name)
+    depths = depths_for_data(data)[0]
+
+    return {
+        "CiD":   f'{cid["CiD"]:.4f}' if cid is not None else "NA",
+        "CMod":  f"{cmod:.4f}" if cmod is not None else "NA",
+        "SCF":   scf["SCF"] if scf is not None else "NA",
+        "SMAD":  str(smad["SMAD"]) if smad is not None else "NA",
+        "DCCMD": f"{dccmd_stats(depths)[2]:.6f}" if depths else "NA",
+    }
+
+def aggregate_json(folder: Path, jobs, agg):
+    """Fill agg from the *.json decompositions in folder (single parse per file)."""
+    # scandir: name filter first, stat only for *.json entries
+    files = [Path(p) for p in sorted(e.path for e in os.scandir(folder)
+                                     if e.name.endswith(".json") and e.is_file())]
+    if not files:
+        sys.exit("No *.json files found in folder.")
+
+    # files are independent -> spread them over worker processes
+    with Pool(jobs) as pool:
+        results = pool.map(compute_all, files, chunksize=16)
+
+    for jf, metrics in zip(files, results):
+        proj, cand = parse_name(jf.name)
+        if not proj or not cand:
+            continue
+        agg[(proj, cand)] = {k: fmt2(v) for k, v in metrics.items()}
+
 def main():
     args = cli()
     root = Path.cwd()
@@ -77,9 +140,16 @@ def main():
     # (Project,Candidate) -> metrics
     agg = defaultdict(lambda: {"CiD":"NA","CMod":"NA","SCF":"NA","SMAD":"NA","DCCMD":"NA"})
 
-    csv_files = sorted(root.glob("*.csv"))
-    if not csv_files:
-        sys.exit("No *.csv files found in current folder.")
+    if args.folder:
+        folder = Path(args.folder).expanduser().resolve()
+        if not folder.is_dir():
+            sys.exit(f"ERROR: {folder} is not a directory")
+        aggregate_json(folder, args.jobs, agg)
+        csv_files = []
+    else:
+        csv_files = sorted(root.glob("*.csv"))
+        if not csv_files:
+            sys.exit("No *.csv files found in current folder.")
 
     for csv_path in csv_files:
         if csv_path.resolve() == out_path:
@@ -105,11 +175,14 @@ def main():
                 val = row.get(metric_col)
                 agg[(proj, cand)][metric_name] = fmt2(val)
 
+    # build the whole table in memory, then write it out in one go
+    buf = io.StringIO(newline="")
+    w = csv.writer(buf)
+    w.writerow(["Project","Candidate","CiD","CMod","SCF","SMAD","DCCMD"])
+    w.writerows([proj, cand, m["CiD"], m["CMod"], m["SCF"], m["SMAD"], m["DCCMD"]]
+                for (proj, cand), m in sorted(agg.items()))
     with open(out_path, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["Project","Candidate","CiD","CMod","SCF","SMAD","DCCMD"])
-        for (proj, cand), m in sorted(agg.items()):
-            w.writerow([proj, cand, m["CiD"], m["CMod"], m["SCF"], m["SMAD"], m["DCCMD"]])
+        f.write(buf.getvalue())
 
     print(f"Wrote aggregated metrics (2 decimals): {out_path}")
 
@@ -13,16 +13,33 @@ Per-partition Cluster Factor:
 Per-file CMod = mean(CF_i) over partitions with at least one edge
 (CF_i = 1.0 if only internal edges; partitions with zero edges are ignored).
 
+Files of 256 MiB or more are streamed with ijson (if installed) instead of
+being loaded whole, so memory stays flat however large the links array is.
+
 Usage:
   python cmod_by_file.py /path/to/folder --csv cmod_by_file.csv
 """
 
-import json, sys, argparse, csv
+import json, sys, argparse, csv, mmap, os
+from multiprocessing import Pool
 from pathlib import Path
-from collections import defaultdict
 from typing import Optional
 
+try:
+    from orjson import loads as json_loads  # optional, much faster C parser
+    HAVE_ORJSON = True
+except ImportError:
+    from json import loads as json_loads
+    HAVE_ORJSON = False
+
+try:
+    import ijson  # optional, only needed to stream very large files
+    HAVE_IJSON = True
+except ImportError:
+    HAVE_IJSON = False
+
 LAYER_KEY = "1_structural_static"
+STREAM_MIN_BYTES = 256 * 1024 * 1024  # files this big are streamed with ijson
 
 # ── CLI ────────────────────────────────────────────────────────────────
 def cli() -> argparse.Namespace:
@@ -30,33 +47,81 @@ def cli() -> argparse.Namespace:
     p.add_argument("folder", help="Folder that holds *.json decompositions")
     p.add_argument("--csv", default="cmod_by_file.csv",
                    help="Output CSV path (default: cmod_by_file.csv)")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="Worker processes (default: all CPU cores)")
     return p.parse_args()
 
+# ── read ONE json file ────────────────────────────────────────────────
+def load_json(path: Path):
+    """Parse a JSON file; with orjson it is parsed straight from an mmap of the file."""
+    if not HAVE_ORJSON:
+        return json_loads(path.read_bytes())
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return json_loads(b"")  # empty file -> usual JSONDecodeError
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+            return json_loads(buf)
+
+# ── stream ONE huge json file ─────────────────────────────────────────
+def cmod_streamed(jpath: Path) -> Optional[float]:
+    """
+    CMod without loading the whole file: ijson reads it twice, once to map
+    nodes to partitions and once to stream the links through the counters.
+    """
+    with open(jpath, "rb") as f:
+        node2part, n_parts = {}, 0
+        for _, arr in ijson.kvitems(f, f"{LAYER_KEY}.decomposition", use_float=True):
+            for n in arr:
+                node2part[n["id"]] = n_parts
+            n_parts += 1
+
+        f.seek(0)
+        links = ijson.items(f, f"{LAYER_KEY}.links.item", use_float=True)
+        return cmod_for_links(node2part, n_parts, links)
+
 # ── compute CMod for ONE file ─────────────────────────────────────────
 def cmod_for_file(jpath: Path) -> Optional[float]:
+    if HAVE_IJSON and jpath.stat().st_size >= STREAM_MIN_BYTES:
+        try:
+            return cmod_streamed(jpath)
+        except ijson.JSONError:
+            return None
+
+    try:
+        data = load_json(jpath)
+    except json.JSONDecodeError:
+        return None
+    return cmod_for_data(data)
+
+def cmod_for_data(data) -> Optional[float]:
+    """CMod for an already parsed decomposition JSON."""
     try:
-        data  = json.loads(jpath.read_text())
         layer = data[LAYER_KEY]
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (KeyError, TypeError):
         return None
 
     decomp = layer.get("decomposition", {})
-    links  = layer.get("links", [])
 
-    # node → partition map
-    node2part = {n["id"]: p for p, arr in decomp.items() for n in arr}
+    # node → partition index (partitions numbered in decomposition order)
+    node2part = {n["id"]: i for i, arr in enumerate(decomp.values()) for n in arr}
 
-    internal = defaultdict(int)    # P → #internal edges (count)
-    outgoing = defaultdict(float)  # P → Σ weights of edges leaving P
-    incoming = defaultdict(float)  # P → Σ weights of edges entering P
+    return cmod_for_links(node2part, len(decomp), layer.get("links", []))
 
+def cmod_for_links(node2part, n_parts, links) -> Optional[float]:
+    """CMod from the node → partition index map and any iterable of links."""
+    internal = [0] * n_parts      # P → #internal edges (count)
+    outgoing = [0.0] * n_parts    # P → Σ weights of edges leaving P
+    incoming = [0.0] * n_parts    # P → Σ weights of edges entering P
+
+    # hot loop: bind the map lookup to a local once instead of per edge
+    part_of = node2part.get
     for e in links:
         src = e.get("source")
         dst = e.get("target")
         if src is None or dst is None:
             continue
-        p_src = node2part.get(src)
-        p_dst = node2part.get(dst)
+        p_src = part_of(src)
+        p_dst = part_of(dst)
         if p_src is None or p_dst is None:
             continue
         w = float(e.get("weight", 1.0))
@@ -68,9 +133,8 @@ def cmod_for_file(jpath: Path) -> Optional[float]:
 
     # per-partition CF and file-level mean
     cf_vals = []
-    for p in decomp.keys():
-        intra = internal.get(p, 0)
-        ext_w = outgoing.get(p, 0.0) + incoming.get(p, 0.0)  # ε_ij + ε_ji
+    for intra, out_w, in_w in zip(internal, outgoing, incoming):
+        ext_w = out_w + in_w  # ε_ij + ε_ji
 
         if ext_w == 0 and intra == 0:
             cf = None  # edgeless partition -> ignore
@@ -91,20 +155,24 @@ def main():
     if not root.is_dir():
         sys.exit(f"ERROR: {root} is not a directory")
 
-    files = sorted(root.glob("*.json"))
+    # scandir: name filter first, stat only for *.json entries
+    files = [Path(p) for p in sorted(e.path for e in os.scandir(root)
+                                     if e.name.endswith(".json") and e.is_file())]
     if not files:
         sys.exit("No .json files found in folder.")
 
+    # files are independent -> spread them over worker processes
+    with Pool(args.jobs) as pool:
+        results = pool.map(cmod_for_file, files, chunksize=16)
+
     rows = []
-    for jf in files:
-        cmod = cmod_for_file(jf)
+    for jf, cmod in zip(files, results):
         rows.append((jf.name, f"{cmod:.4f}" if cmod is not None else "NA"))
 
     with open(args.csv, "w", newline="") as f:
         w = csv.writer(f)
         w.writerow(["file", "CMod"])
-        for row in rows:
-            w.writerow(row)
+        w.writerows(rows)
 
     print(f"Wrote file-level CMod CSV: {args.csv}")
 
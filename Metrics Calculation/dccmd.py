@@ -15,12 +15,19 @@ Usage:
   python dccmd_by_file_k2.py /path/to/folder [--long]
 """
 
-import json, sys, argparse, csv
+import json, sys, argparse, csv, mmap, os
+from multiprocessing import Pool
 from pathlib import Path
 from collections import defaultdict
-from functools import lru_cache
 from statistics import median
 
+try:
+    from orjson import loads as json_loads  # optional, much faster C parser
+    HAVE_ORJSON = True
+except ImportError:
+    from json import loads as json_loads
+    HAVE_ORJSON = False
+
 L1 = "1_structural_static"
 L3 = "3_business_use_cases"
 
@@ -33,38 +40,80 @@ def cli():
                    help="output CSV path (long format)")
     p.add_argument("--long", action="store_true",
                    help="also write the long-format CSV")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="worker processes (default: all CPU cores)")
     return p.parse_args()
 
-def longest_path(start, adj):
-    @lru_cache(maxsize=None)
+def longest_path_fn(adj):
+    """
+    adj[i] = services one hop away from service i (services are ints 0..n-1).
+    Return longest(start) -> longest simple path (in hops) from start.
+    The adjacency and memo are built once and shared by all starts.
+    """
+    # visited set -> int bitmask; memo key = (seen, node) packed in one int
+    succ = [[(t, 1 << t) for t in outs] for outs in adj]  # (next id, its bit)
+    shift = max(1, (len(succ) - 1).bit_length())
+    memo = {}
+
     def dfs(node, seen):
+        key = (seen << shift) | node
+        best = memo.get(key)
+        if best is not None:
+            return best
         best = 0
-        for nxt in adj[node]:
-            if nxt not in seen:
-                best = max(best, 1 + dfs(nxt, seen | {nxt}))
+        for nxt, bit in succ[node]:
+            if not seen & bit:
+                d = 1 + dfs(nxt, seen | bit)
+                if d > best:
+                    best = d
+        memo[key] = best
         return best
-    return dfs(start, frozenset({start}))
+
+    def longest(start):
+        return dfs(start, 1 << start)
+
+    return longest
+
+def load_json(path: Path):
+    """Parse a JSON file; with orjson it is parsed straight from an mmap of the file."""
+    if not HAVE_ORJSON:
+        return json_loads(path.read_bytes())
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return json_loads(b"")  # empty file -> usual JSONDecodeError
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+            return json_loads(buf)
 
 def depths_for_file(jf: Path):
     try:
-        data = json.loads(jf.read_text())
+        data = load_json(jf)
+    except json.JSONDecodeError:
+        return None, None
+    return depths_for_data(data)
+
+def depths_for_data(data):
+    """Per-story depths and service count for an already parsed JSON."""
+    try:
         struct = data[L1]
         bus    = data[L3]
-    except (json.JSONDecodeError, KeyError):
+    except KeyError:
         return None, None
 
-    # class → service map
-    cls2svc = {n["id"]: svc
-               for svc, nodes in struct["decomposition"].items()
+    decomp = struct["decomposition"]
+
+    # class → service index (services numbered in decomposition order);
+    # services with an empty name stay unmapped, as they were always skipped
+    cls2svc = {n["id"]: i
+               for i, (svc, nodes) in enumerate(decomp.items()) if svc
                for n in nodes}
-    services = sorted(struct["decomposition"].keys())
+    svc_of = cls2svc.get
 
     # service-level adjacency (cross-service only)
-    adj = {s: set() for s in services}
+    adj = [set() for _ in decomp]
     for e in struct.get("links", []):
-        s_src = cls2svc.get(e.get("source"))
-        s_dst = cls2svc.get(e.get("target"))
-        if s_src and s_dst and s_src != s_dst:
+        s_src = svc_of(e.get("source"))
+        s_dst = svc_of(e.get("target"))
+        if s_src is not None and s_dst is not None and s_src != s_dst:
             adj[s_src].add(s_dst)
 
     # story → starting services (original "USE CASE" filter)
@@ -72,22 +121,26 @@ def depths_for_file(jf: Path):
     for e in bus.get("links", []):
         story = e.get("source", "")
         if isinstance(story, str) and "USE CASE" in story.upper():
-            svc = cls2svc.get(e.get("target"))
-            if svc:
+            svc = svc_of(e.get("target"))
+            if svc is not None:
                 story2svcs[story].add(svc)
 
     if not story2svcs:
-        return None, len(services)
+        return None, len(decomp)
 
     # per-story depth = longest path from any touched service
-    depths = []
-    for svcs in story2svcs.values():
-        best = 0
-        for s in svcs:
-            best = max(best, longest_path(s, adj))
-        depths.append(best)
+    longest = longest_path_fn(adj)
+    depths = [max(longest(s) for s in svcs) for svcs in story2svcs.values()]
+
+    return depths, len(decomp)
 
-    return depths, len(services)
+def dccmd_stats(depths):
+    """Return (medDepth, MADraw, DCCMD) for c' = 2.0."""
+    # sort once: median() then sees presorted runs (linear-time Timsort)
+    depths = sorted(depths)
+    med = median(depths)
+    mad_raw = median([abs(d - med) for d in depths])
+    return med, mad_raw, 1 - (mad_raw / (mad_raw + 2))
 
 def main():
     args = cli()
@@ -95,13 +148,18 @@ def main():
     if not root.is_dir():
         sys.exit(f"{root} is not a directory")
 
-    files = sorted(root.glob("*.json"))
+    # scandir: name filter first, stat only for *.json entries
+    files = [Path(p) for p in sorted(e.path for e in os.scandir(root)
+                                     if e.name.endswith(".json") and e.is_file())]
     if not files:
         sys.exit("No *.json files found.")
 
+    # files are independent -> spread them over worker processes
+    with Pool(args.jobs) as pool:
+        results = pool.map(depths_for_file, files, chunksize=16)
+
     rows = []
-    for jf in files:
-        depths, svc_cnt = depths_for_file(jf)
+    for jf, (depths, svc_cnt) in zip(files, results):
         if not depths:
             rows.append({
                 "file": jf.name,
@@ -113,9 +171,7 @@ def main():
             })
             continue
 
-        med = median(depths)
-        mad_raw = median(abs(d - med) for d in depths)
-        dccmd = 1 - (mad_raw / (mad_raw + 2))
+        med, mad_raw, dccmd = dccmd_stats(depths)
 
         rows.append({
             "file": jf.name,
@@ -129,10 +185,9 @@ def main():
     # ---- write wide CSV ----
     wide_fields = ["file","DCCMD", "stories", "svc", "medDepth", "MADraw"]
     with open(args.wide_csv, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=wide_fields)
-        w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k, "") for k in wide_fields})
+        w = csv.writer(f)
+        w.writerow(wide_fields)
+        w.writerows([r.get(k, "") for k in wide_fields] for r in rows)
     print(f"Wrote per-file wide CSV: {args.wide_csv}")
 
 if __name__ == "__main__":
@@ -13,9 +13,17 @@ Usage:
   python scf_by_file.py /path/to/folder --csv scf_by_file.csv
 """
 
-import argparse, json, sys, math, csv
+import argparse, json, sys, math, csv, mmap, os
+from multiprocessing import Pool
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads  # optional, much faster C parser
+    HAVE_ORJSON = True
+except ImportError:
+    from json import loads as json_loads
+    HAVE_ORJSON = False
+
 LAYER_KEY = "1_structural_static"
 
 
@@ -24,9 +32,23 @@ def cli():
     p = argparse.ArgumentParser(description="Per-file Service Coupling Factor (SCF) to CSV")
     p.add_argument("folder", help="Directory containing *.json decomposition files")
     p.add_argument("--csv", default="scf_by_file.csv", help="Output CSV path")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="Worker processes (default: all CPU cores)")
     return p.parse_args()
 
 
+# ─── Read one json file ─────────────────────────────────────────────────
+def load_json(path: Path):
+    """Parse a JSON file; with orjson it is parsed straight from an mmap of the file."""
+    if not HAVE_ORJSON:
+        return json_loads(path.read_bytes())
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return json_loads(b"")  # empty file -> usual JSONDecodeError
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+            return json_loads(buf)
+
+
 # ─── SCF for one file ───────────────────────────────────────────────────
 def scf_for_file(jpath: Path):
     """
@@ -34,33 +56,37 @@ def scf_for_file(jpath: Path):
     or None on error/unreadable file.
     """
     try:
-        data  = json.loads(jpath.read_text())
+        data = load_json(jpath)
+    except json.JSONDecodeError:
+        return None
+    return scf_for_data(data, jpath.name)
+
+
+def scf_for_data(data, name: str):
+    """Same as scf_for_file, for an already parsed decomposition JSON."""
+    try:
         block = data[LAYER_KEY]
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (KeyError, TypeError):
         return None
 
     decomp = block.get("decomposition", {})
     links  = block.get("links", [])
 
     # every key is a service
-    services = sorted(decomp.keys())
+    svc_count = len(decomp)
     svc_of = {n["id"]: s for s, lst in decomp.items() for n in lst}
 
-    ext_edges = 0
-    for e in links:
-        src = e.get("source")
-        dst = e.get("target")
-        s_src = svc_of.get(src)
-        s_dst = svc_of.get(dst)
-        if s_src and s_dst and s_src != s_dst:
-            ext_edges += 1  # directed edge counted once
+    # directed cross-service edges, each counted once
+    ext_edges = sum(1 for e in links
+                    if (s_src := svc_of.get(e.get("source")))
+                    and (s_dst := svc_of.get(e.get("target")))
+                    and s_src != s_dst)
 
-    svc_count = len(services)
     denom = ext_edges + svc_count
     scf = 0.0 if denom == 0 else math.sqrt(svc_count / denom)  # matches your original script
 
     return {
-        "file": jpath.name,
+        "file": name,
         "services": svc_count,
         "external_edges": ext_edges,
         "SCF": f"{scf:.4f}",
@@ -74,23 +100,28 @@ def main():
     if not root.is_dir():
         sys.exit(f"ERROR: {root} is not a directory")
 
-    files = sorted(root.glob("*.json"))
+    # scandir: name filter first, stat only for *.json entries
+    files = [Path(p) for p in sorted(e.path for e in os.scandir(root)
+                                     if e.name.endswith(".json") and e.is_file())]
     if not files:
         sys.exit("No .json files found in folder.")
 
+    # files are independent -> spread them over worker processes
+    with Pool(args.jobs) as pool:
+        results = pool.map(scf_for_file, files, chunksize=16)
+
     rows = []
-    for jf in files:
-        res = scf_for_file(jf)
+    for jf, res in zip(files, results):
         if res is None:
             rows.append({"file": jf.name, "services": "NA", "external_edges": "NA", "SCF": "NA"})
         else:
             rows.append(res)
 
+    fields = ["file","SCF", "services", "external_edges"]
     with open(args.csv, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=["file","SCF", "services", "external_edges"])
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+        w = csv.writer(f)
+        w.writerow(fields)
+        w.writerows([r[k] for k in fields] for r in rows)
 
     print(f"Wrote SCF CSV: {args.csv}")
 